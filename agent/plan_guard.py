@@ -0,0 +1,179 @@
+# agent/plan_guard.py
+"""
+Pre-execution cost gate for generated SQL.
+
+Runs `EXPLAIN (FORMAT JSON)` (cached by normalized SQL) and rejects queries whose
+estimated cost or row count exceeds the configured thresholds. Over-budget plain
+row listings without a LIMIT are first retried with one added (reported as
+`rewritten` so the UI can say the result is truncated); anything else that is
+still too expensive gets a rejection reason to feed back to the LLM.
+Cache hits cost no database round trip. Once an entry is older than PLAN_CACHE_TTL
+seconds, the row counts / analyze times of the referenced tables are compared with
+those recorded alongside the plan. An unchanged fingerprint renews the entry; a
+changed one (e.g. after an ETL or dbt reload) triggers a fresh EXPLAIN.
+Plan estimates and actual runtimes go to logs/plan_stats.jsonl for tuning.
+"""
+import os
+import re
+import json
+import hashlib
+import time
+from collections import OrderedDict
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+
+from .query_executor import explain_query, table_stats
+
+_plan_cache = OrderedDict()
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form used as the plan cache key (formatting / case / trailing ';' do not matter)."""
+    try:
+        return sqlglot.transpile(sql, read="postgres", write="postgres", normalize=True)[0]
+    except ParseError:
+        return re.sub(r"\s+", " ", sql.strip().rstrip(";")).lower()
+
+
+def referenced_tables(sql: str) -> list:
+    """Physical tables referenced by `sql` (CTE names excluded)."""
+    try:
+        parsed = sqlglot.parse_one(sql, read="postgres")
+    except ParseError:
+        return []
+    ctes = {cte.alias_or_name for cte in parsed.find_all(exp.CTE)}
+    return sorted({t.name for t in parsed.find_all(exp.Table) if t.name and t.name not in ctes})
+
+
+def get_plan(sql: str, explain=explain_query, stats=table_stats, ttl: float = None) -> dict:
+    """
+    EXPLAIN `sql`, served from an LRU cache keyed by normalized SQL.
+    Entries younger than `ttl` seconds are used as is; older ones are revalidated
+    against the referenced tables' statistics fingerprint and re-EXPLAINed only if it changed.
+    """
+    ttl = float(os.getenv("PLAN_CACHE_TTL", 600)) if ttl is None else ttl
+    key = normalize_sql(sql)
+    cached = _plan_cache.get(key)
+    if cached and time.time() - cached["at"] < ttl:
+        _plan_cache.move_to_end(key)
+        return cached["plan"]
+
+    fingerprint = stats(referenced_tables(sql))
+    if cached and cached["fingerprint"] == fingerprint:
+        cached["at"] = time.time()
+        _plan_cache.move_to_end(key)
+        return cached["plan"]
+    plan = explain(sql)
+    _plan_cache[key] = {"plan": plan, "at": time.time(), "fingerprint": fingerprint}
+    _plan_cache.move_to_end(key)
+    if len(_plan_cache) > int(os.getenv("PLAN_CACHE_SIZE", 256)):
+        _plan_cache.popitem(last=False)
+    return plan
+
+
+def clear_plan_cache():
+    _plan_cache.clear()
+
+
+def has_limit(sql: str) -> bool:
+    try:
+        return sqlglot.parse_one(sql, read="postgres").args.get("limit") is not None
+    except ParseError:
+        return re.search(r"\blimit\s+\d+", sql, re.IGNORECASE) is not None
+
+
+def add_limit(sql: str, limit: int = None) -> str:
+    limit = int(os.getenv("PLAN_DEFAULT_LIMIT", 20)) if limit is None else limit
+    try:
+        parsed = sqlglot.parse_one(sql, read="postgres")
+        if isinstance(parsed, exp.Query):
+            return parsed.limit(limit).sql(dialect="postgres")
+    except ParseError:
+        pass
+    return f"{sql.strip().rstrip(';')} LIMIT {limit}"
+
+
+def is_row_listing(sql: str) -> bool:
+    """
+    True for a plain SELECT listing rows (no GROUP BY, aggregates, DISTINCT or set ops).
+    Only these can be capped with a LIMIT without changing what the answer means.
+    """
+    try:
+        parsed = sqlglot.parse_one(sql, read="postgres")
+    except ParseError:
+        return False
+    if not isinstance(parsed, exp.Select):
+        return False
+    if parsed.args.get("group") or parsed.args.get("distinct"):
+        return False
+    return not any(isinstance(node, exp.AggFunc) for col in parsed.expressions for node in col.walk())
+
+
+def _over_budget(plan: dict, max_cost: float, max_rows: float) -> bool:
+    return plan["Total Cost"] > max_cost or plan["Plan Rows"] > max_rows
+
+
+def check_plan(
+    sql: str, max_cost: float = None, max_rows: float = None, explain=explain_query, stats=table_stats
+) -> dict:
+    """
+    Gate `sql` on its estimated plan.
+    Returns a dict with the (possibly LIMIT-rewritten) sql, ok flag, estimates and a rejection reason.
+    """
+    # Settings are read at call time (never at import) so values from .env, which the
+    # agent loads lazily, apply here and in get_plan / add_limit / record_plan_stats
+    max_cost = float(os.getenv("MAX_PLAN_COST", 1e6)) if max_cost is None else max_cost
+    max_rows = float(os.getenv("MAX_PLAN_ROWS", 1e6)) if max_rows is None else max_rows
+    limit = int(os.getenv("PLAN_DEFAULT_LIMIT", 20))
+
+    plan = get_plan(sql, explain, stats)
+    res = {
+        "sql": sql,
+        "ok": True,
+        "rewritten": False,
+        "plan_cost": plan["Total Cost"],
+        "plan_rows": plan["Plan Rows"],
+        "reason": None,
+    }
+    if not _over_budget(plan, max_cost, max_rows):
+        return res
+
+    if not has_limit(sql) and is_row_listing(sql):
+        limited = add_limit(sql, limit)
+        limited_plan = get_plan(limited, explain, stats)
+        if not _over_budget(limited_plan, max_cost, max_rows):
+            print(f"Plan over budget; added LIMIT {limit}.")
+            res.update(
+                sql=limited,
+                rewritten=True,
+                plan_cost=limited_plan["Total Cost"],
+                plan_rows=limited_plan["Plan Rows"],
+            )
+            return res
+
+    res["ok"] = False
+    res["reason"] = (
+        f"Estimated cost {plan['Total Cost']:.0f} (max {max_cost:.0f}) and rows {plan['Plan Rows']:.0f} "
+        f"(max {max_rows:.0f}) are too high. Avoid cross joins and unfiltered scans of raw tables; "
+        f"join on keys, filter and aggregate before joining, and query the fct_/dim_ models."
+    )
+    return res
+
+
+def record_plan_stats(check: dict, runtime_ms: float = None, path: str = None):
+    """Append plan estimates (and actual runtime if executed) for threshold tuning."""
+    path = path or os.getenv("PLAN_STATS_PATH", "logs/plan_stats.jsonl")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    entry = {
+        "ts": time.time(),
+        "sql_hash": hashlib.sha1(normalize_sql(check["sql"]).encode()).hexdigest()[:12],
+        "ok": check["ok"],
+        "rewritten": check["rewritten"],
+        "plan_cost": check["plan_cost"],
+        "plan_rows": check["plan_rows"],
+        "runtime_ms": runtime_ms,
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
@@ -1,11 +1,18 @@
 # agent/query_executor.py
+from functools import lru_cache
 from sqlalchemy import create_engine, text
 import os
+import json
 import pandas as pd
 
 
-def run_query(sql: str) -> pd.DataFrame:
-    """Execute SQL against Postgres using env vars (works both locally & in Docker)."""
+@lru_cache(maxsize=None)
+def _engine(engine_url: str):
+    return create_engine(engine_url)
+
+
+def get_engine():
+    """Shared engine (and connection pool) built from env vars (works both locally & in Docker)."""
     host = os.getenv("POSTGRES_HOST", "localhost")
     port = os.getenv("POSTGRES_PORT", "5432")
     user = os.getenv("POSTGRES_USER", "genai")
@@ -15,12 +22,47 @@ def run_query(sql: str) -> pd.DataFrame:
     engine_url = (
         f"postgresql+psycopg2://{user}:{password}@{host}:{port}/{database}"
     )
+    return _engine(engine_url)
 
-    engine = create_engine(engine_url)
 
+def run_query(sql: str) -> pd.DataFrame:
+    """Execute SQL against Postgres."""
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             df = pd.read_sql(text(sql), conn)
         return df
     except Exception as e:
         raise RuntimeError(f"Database query failed: {e}")
+
+
+def explain_query(sql: str) -> dict:
+    """Return the top-level plan node of `EXPLAIN (FORMAT JSON)` (estimates only, nothing is executed)."""
+    try:
+        with get_engine().connect() as conn:
+            result = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql.strip().rstrip(';')}")).scalar()
+    except Exception as e:
+        raise RuntimeError(f"EXPLAIN failed: {e}")
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]["Plan"]
+
+
+def table_stats(tables) -> tuple:
+    """
+    Row-count / analyze fingerprint of `tables` from pg_stat_user_tables.
+    Changes whenever ETL or dbt reloads, grows or re-analyzes one of them.
+    """
+    if not tables:
+        return ()
+    sql = text("""
+        SELECT relid, relname, n_live_tup, n_mod_since_analyze, last_analyze, last_autoanalyze
+        FROM pg_stat_user_tables
+        WHERE relname = ANY(:tables)
+        ORDER BY relname, relid
+    """)
+    try:
+        with get_engine().connect() as conn:
+            rows = conn.execute(sql, {"tables": list(tables)}).fetchall()
+    except Exception as e:
+        raise RuntimeError(f"Table stats lookup failed: {e}")
+    return tuple(tuple(str(v) for v in row) for row in rows)
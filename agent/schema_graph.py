@@ -0,0 +1,122 @@
+# agent/schema_graph.py
+"""
+Schema-aware pruning of retrieved context.
+
+Builds a graph of models (tables) from the merged semantic layer's entities and
+joins, keeps only the clearly relevant vector hits (cut at the largest score gap),
+and expands them to the smallest connected set of tables so the prompt carries
+exactly the tables and join conditions needed.
+"""
+import os
+import json
+from collections import deque
+
+_cache = {}
+
+
+def load_semantic(path: str = None):
+    """Load merged_semantic.json (cached until the file changes). Returns None if missing."""
+    # SEMANTIC_PATH is read at call time so a value from .env (loaded lazily by the agent) applies
+    path = path or os.getenv("SEMANTIC_PATH", "semantic/merged_semantic.json")
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path) as f:
+        semantic = json.load(f)
+    _cache[path] = (mtime, semantic)
+    return semantic
+
+
+def format_doc(section: str, name: str, details) -> str:
+    """Same text layout as the documents stored in the Chroma semantic index."""
+    return f"{section.upper()} {name}: {json.dumps(details)}"
+
+
+def build_graph(semantic: dict) -> dict:
+    """Adjacency map model -> set of models it can be joined to."""
+    graph = {e["model"]: set() for e in semantic.get("entities", {}).values() if e.get("model")}
+    for join in semantic.get("joins", []):
+        left, right = join["left_model"], join["right_model"]
+        graph.setdefault(left, set()).add(right)
+        graph.setdefault(right, set()).add(left)
+    return graph
+
+
+def hit_model(semantic: dict, meta: dict):
+    """Model (table) an indexed entity / metric / dimension refers to."""
+    details = semantic.get(meta.get("type"), {}).get(meta.get("name"), {})
+    return details.get("model") if isinstance(details, dict) else None
+
+
+def adaptive_k(distances, max_k: int, min_k: int = 1, gap_factor: float = 1.5) -> int:
+    """
+    Number of hits to keep: cut at the largest jump in distance among the top `max_k`,
+    if that jump is at least `gap_factor` times the average gap; otherwise keep all `max_k`.
+    """
+    dists = list(distances)[:max_k]
+    if len(dists) <= min_k:
+        return len(dists)
+    gaps = [(dists[i + 1] - dists[i], i + 1) for i in range(min_k - 1, len(dists) - 1)]
+    mean_gap = (dists[-1] - dists[min_k - 1]) / len(gaps)
+    gap, cut = max(gaps)
+    return cut if mean_gap > 0 and gap >= gap_factor * mean_gap else len(dists)
+
+
+def _shortest_path(graph: dict, sources: set, target: str):
+    """BFS from any node in `sources` to `target`; returns the path or None."""
+    prev = {s: None for s in sources}
+    queue = deque(sources)
+    while queue:
+        node = queue.popleft()
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = prev[node]
+            return path
+        for nxt in graph.get(node, ()):
+            if nxt not in prev:
+                prev[nxt] = node
+                queue.append(nxt)
+    return None
+
+
+def connect_models(graph: dict, seeds) -> list:
+    """
+    Grow a minimal connected set of models covering `seeds` (greedy Steiner tree:
+    attach each seed through its shortest join path to the tables chosen so far).
+    Seeds with no join path are kept on their own.
+    """
+    selected = []
+    for seed in seeds:
+        if seed in selected:
+            continue
+        path = _shortest_path(graph, set(selected), seed) if selected else None
+        for model in reversed(path or [seed]):
+            if model not in selected:
+                selected.append(model)
+    return selected
+
+
+def build_context(semantic: dict, docs, metas, max_k: int = 5, distances=None) -> str:
+    """Prune retrieved hits to the relevant tables and return the prompt context text."""
+    keep = adaptive_k(distances, max_k) if distances else min(max_k, len(docs))
+    hits = list(zip(docs, metas))[:keep]
+
+    seeds = [m for m in (hit_model(semantic, meta or {}) for _, meta in hits) if m]
+    tables = connect_models(build_graph(semantic), seeds)
+
+    lines = [doc for doc, _ in hits]
+    present = {(meta or {}).get("name") for _, meta in hits if (meta or {}).get("type") == "entities"}
+    # Tables pulled in only to connect the hits still need their entity definition
+    for name, entity in semantic.get("entities", {}).items():
+        if entity.get("model") in tables and name not in present:
+            lines.append(format_doc("entities", name, entity))
+    for join in semantic.get("joins", []):
+        if join["left_model"] in tables and join["right_model"] in tables:
+            lines.append(f"JOIN {join['left_model']} -> {join['right_model']} ON {join['condition']}")
+    return "\n".join(lines)
@@ -1,37 +1,48 @@
 # agent/text_to_sql_agent.py
+"""
+Text-to-SQL agent.
+
+Heavy dependencies (chromadb, langchain, sentence-transformers) and `.env` loading
+are deferred to first use, so importing this module stays cheap for the Streamlit
+app and unit tests. Call `prewarm()` to pay that cost up front in long-lived workers.
+"""
 
 import os
 import json
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-from chromadb import HttpClient
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
+import time
 import re
-
-# Optional local embeddings
-try:
-    from langchain_openai import OpenAIEmbeddings
-    from langchain_huggingface import HuggingFaceEmbeddings
-except ImportError:
-    raise ImportError("Please install: poetry add langchain-openai langchain-huggingface sentence-transformers")
+from functools import lru_cache
 
 from .sql_validator import validate_sql
+from . import schema_graph, plan_guard
 from .query_executor import run_query
 
 
+@lru_cache(maxsize=None)
+def load_env():
+    """Load environment variables from .env (once)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
 # -----------------------------------------------------------
 # Embeddings Helper
 # -----------------------------------------------------------
 
+@lru_cache(maxsize=None)
 def get_embeddings():
     """
     Dynamically choose embeddings based on environment.
     Ensures consistency with the semantic index.
+    Cached: the local MiniLM model is loaded once per process.
     """
+    load_env()
+    try:
+        from langchain_openai import OpenAIEmbeddings
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError:
+        raise ImportError("Please install: poetry add langchain-openai langchain-huggingface sentence-transformers")
+
     if os.getenv("OPENAI_API_KEY"):
         print("🔑 Using OpenAI embeddings for retrieval...")
         return OpenAIEmbeddings()
@@ -40,6 +51,53 @@ def get_embeddings():
         return HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
 
 
+@lru_cache(maxsize=None)
+def get_chroma_client():
+    """Chroma HTTP client, created once per process."""
+    load_env()
+    from chromadb import HttpClient
+    return HttpClient(
+        host=os.getenv("CHROMA_HOST", "localhost"),
+        port=int(os.getenv("CHROMA_HTTP_PORT", 8000)),
+        tenant="default_tenant",
+        database="default_database",
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    """Chat model client, created once per process."""
+    load_env()
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model="gpt-4-turbo", temperature=0)
+
+
+def prewarm() -> dict:
+    """
+    Load models and clients before serving traffic (embeddings, Chroma, LLM client,
+    semantic layer). Returns per-step load times in seconds; a failing step is
+    reported and skipped so a worker can still start and retry lazily later.
+    """
+    timings = {}
+    for name, step in [
+        ("env", load_env),
+        ("embeddings", get_embeddings),
+        # Embed once so lazily initialised model weights / tokenizers are fully loaded
+        ("embed_warmup", lambda: get_embeddings().embed_documents(["warmup"])),
+        ("chroma", get_chroma_client),
+        ("llm", get_llm),
+        ("semantic_layer", schema_graph.load_semantic),
+    ]:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"Prewarm step '{name}' failed: {e}")
+        timings[name] = round(time.perf_counter() - start, 3)
+    print(f"🔥 Prewarm done: {timings}")
+    return timings
+
+
 # -----------------------------------------------------------
 # 🔹 Context Retrieval from Chroma
 # -----------------------------------------------------------
@@ -47,23 +105,34 @@ def get_embeddings():
 def retrieve_context(question: str, top_k: int = 5) -> str:
     """
     Query the Chroma semantic index to retrieve relevant schema/metric context.
+    Hits are cut adaptively at the largest score gap (at most `top_k`) and expanded
+    along the semantic layer's joins to the minimal connected set of tables.
     """
-    client = HttpClient(
-        host=os.getenv("CHROMA_HOST", "localhost"),
-        port=int(os.getenv("CHROMA_HTTP_PORT", 8000)),
-        tenant="default_tenant",
-        database="default_database",
-    )
-
-    coll = client.get_collection("semantic_index")
+    coll = get_chroma_client().get_collection("semantic_index")
     embedder = get_embeddings()
     query_embeds = embedder.embed_documents([question])
 
-    results = coll.query(query_embeddings=query_embeds, n_results=top_k)
+    results = coll.query(
+        query_embeddings=query_embeds,
+        n_results=top_k,
+        include=["documents", "metadatas", "distances"],
+    )
     docs = results.get("documents", [[]])[0]
-    context_text = "\n".join(docs)
 
-    print(f"📚 Retrieved {len(docs)} context snippets from Chroma.")
+    semantic = schema_graph.load_semantic()
+    if semantic is None:
+        # No merged semantic layer on disk: fall back to plain vector similarity
+        context_text = "\n".join(docs)
+    else:
+        context_text = schema_graph.build_context(
+            semantic,
+            docs,
+            (results.get("metadatas") or [[]])[0],
+            max_k=top_k,
+            distances=(results.get("distances") or [[]])[0],
+        )
+
+    print(f"📚 Retrieved {len(docs)} context snippets from Chroma ({len(context_text.splitlines())} lines after schema pruning).")
     return context_text
 
 
@@ -87,16 +156,21 @@ def clean_sql_output(raw_output: str) -> str:
     return raw_output
 
 
-def generate_sql(question: str) -> str:
+def generate_sql(question: str, feedback: str = None) -> str:
     """
     Generate SQL query via GPT-4 using context + template,
     clean and validate it using SQLGlot.
+    `feedback` explains why a previous attempt was rejected (e.g. by the plan guard).
     """
+    from langchain_core.prompts import PromptTemplate
+
     context = retrieve_context(question)
     prompt_template = PromptTemplate.from_file("agent/prompt_template.txt")
 
-    llm = ChatOpenAI(model="gpt-4-turbo", temperature=0)
+    llm = get_llm()
     prompt = prompt_template.format(context=context, question=question)
+    if feedback:
+        prompt += f"\n\nYour previous query was rejected: {feedback}\nWrite a cheaper query that still answers the question."
 
     # First attempt
     response = llm.invoke(prompt)
@@ -135,20 +209,43 @@ def query_agent(question: str):
     1. Retrieve semantic context
     2. Generate SQL
     3. Validate SQL
-    4. Execute SQL
-    5. Return dataframe
+    4. Gate on EXPLAIN cost (retry once with feedback if over budget)
+    5. Execute SQL
+    6. Return dataframe
     """
+    load_env()
     sql = generate_sql(question)
     print(f"\n Generated SQL:\n{sql}\n")
 
+    check = plan_guard.check_plan(sql)
+    if not check["ok"]:
+        plan_guard.record_plan_stats(check)
+        print(f"Query plan rejected: {check['reason']} Retrying with feedback...")
+        sql = generate_sql(question, feedback=check["reason"])
+        check = plan_guard.check_plan(sql)
+        if not check["ok"]:
+            plan_guard.record_plan_stats(check)
+            raise ValueError(f"Generated SQL rejected by query plan guard after retry: {check['reason']}")
+    sql = check["sql"]
+
+    start = time.perf_counter()
     df = run_query(sql)
-    print(f"Returned {len(df)} rows.\n")
+    runtime_ms = round((time.perf_counter() - start) * 1000, 1)
+    plan_guard.record_plan_stats(check, runtime_ms)
+    print(f"Returned {len(df)} rows in {runtime_ms} ms (estimated cost {check['plan_cost']:.0f}).\n")
     print(df.head(5))
 
     # Optional: persist query logs (future Streamlit use)
     os.makedirs("logs", exist_ok=True)
     with open("logs/query_log.jsonl", "a") as f:
-        f.write(json.dumps({"question": question, "sql": sql, "rows": len(df)}) + "\n")
+        f.write(json.dumps({
+            "question": question,
+            "sql": sql,
+            "rows": len(df),
+            "plan_cost": check["plan_cost"],
+            "plan_rewritten": check["rewritten"],
+            "runtime_ms": runtime_ms,
+        }) + "\n")
 
     return df
 
@@ -1,7 +1,9 @@
 # airflow/dags/etl_dag.py
 from datetime import datetime, timedelta
 from airflow import DAG
+from airflow.exceptions import AirflowSkipException
 from airflow.operators.python import PythonOperator
+from airflow.utils.trigger_rule import TriggerRule
 import os
 import sys
 import logging
@@ -14,16 +16,64 @@ if SCRIPTS_DIR not in sys.path:
 
 logger = logging.getLogger("airflow.etl.dag")
 
-def run_ge_checks():
-    from scripts import ge_checks
-    ge_checks.run_checks()
+TABLES = ["orders", "shipments", "inventory"]
+RAW_TABLES = [f"raw_{t}" for t in TABLES]
 
-def run_etl():
+
+def run_ge_checks(table):
+    from scripts import ge_checks, etl, pipeline_state
+    # Nothing to validate if this exact file content is already loaded
+    if pipeline_state.is_unchanged(etl.pg_engine(), f"raw_{table}", etl.source_hash(table)):
+        raise AirflowSkipException(f"{table}.csv unchanged since last load")
+    ge_checks.check_table(table)
+
+
+def run_load(table):
     from scripts import etl
-    res = etl.run_etl()
-    logger.info("ETL returned: %s", res)
+    res = etl.load_table(table)
+    logger.info("Load returned: %s", res)
+    if res["skipped"]:
+        raise AirflowSkipException(f"raw_{table} unchanged")
     return res
 
+
+def run_dbt(layer, upstream_keys):
+    from scripts import dbt_runner, etl, pipeline_state
+    engine = etl.pg_engine()
+    upstream = pipeline_state.combine(*(pipeline_state.get_state(engine, k) for k in upstream_keys))
+    res = dbt_runner.run_layer(layer, upstream)
+    logger.info("dbt returned: %s", res)
+    if res["skipped"]:
+        raise AirflowSkipException(f"dbt layer {layer} unchanged")
+    return res
+
+
+def run_build_index():
+    from scripts import dbt_runner, etl, pipeline_state
+    from semantic import semantic_builder
+
+    semantic_dir = os.path.join(dbt_runner.PROJECT_DIR, "semantic")
+    merged_path = os.path.join(semantic_dir, "merged_semantic.json")
+
+    dbt_models = semantic_builder.extract_dbt_metadata(
+        os.path.join(dbt_runner.PROJECT_DIR, "dbt", "target", "manifest.json")
+    )
+    semantic = semantic_builder.load_semantic_layer(os.path.join(semantic_dir, "semantic_layer.json"))
+    merged = semantic_builder.merge_semantic_with_dbt(semantic, dbt_models)
+
+    engine = etl.pg_engine()
+    digest = pipeline_state.hash_json(merged)
+    if pipeline_state.is_unchanged(engine, "semantic_index", digest) and os.path.exists(merged_path):
+        raise AirflowSkipException("Semantic layer unchanged")
+
+    semantic_builder.write_merged(merged, merged_path)
+
+    # Heavy (chromadb / embeddings) import only when we actually rebuild
+    from semantic import build_semantic_index
+    build_semantic_index.build_index(merged_path)
+    pipeline_state.mark_done(engine, "semantic_index", digest)
+
+
 default_args = {
     "owner": "airflow",
     "depends_on_past": False,
@@ -41,14 +91,41 @@ with DAG(
     tags=["genai", "sprint1"],
 ) as dag:
 
-    t1 = PythonOperator(
-        task_id="ge_checks",
-        python_callable=run_ge_checks,
+    # Per-table validate -> load, fanned out in parallel
+    loads = []
+    for table in TABLES:
+        validate = PythonOperator(
+            task_id=f"ge_checks_{table}",
+            python_callable=run_ge_checks,
+            op_args=[table],
+        )
+        load = PythonOperator(
+            task_id=f"load_raw_{table}",
+            python_callable=run_load,
+            op_args=[table],
+        )
+        validate >> load
+        loads.append(load)
+
+    # Run unless something upstream failed; each task hash-checks its own inputs and skips itself
+    dbt_staging = PythonOperator(
+        task_id="dbt_staging",
+        python_callable=run_dbt,
+        op_args=["staging", RAW_TABLES],
+        trigger_rule=TriggerRule.NONE_FAILED,
+    )
+
+    dbt_marts = PythonOperator(
+        task_id="dbt_marts",
+        python_callable=run_dbt,
+        op_args=["marts", ["dbt_staging"]],
+        trigger_rule=TriggerRule.NONE_FAILED,
     )
 
-    t2 = PythonOperator(
-        task_id="run_etl",
-        python_callable=run_etl,
+    build_index = PythonOperator(
+        task_id="build_index",
+        python_callable=run_build_index,
+        trigger_rule=TriggerRule.NONE_FAILED,
     )
 
-    t1 >> t2
+    loads >> dbt_staging >> dbt_marts >> build_index
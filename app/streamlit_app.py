@@ -11,10 +11,14 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import json
+from dotenv import load_dotenv
+
+# Load .env before any os.getenv below (the agent loads it lazily, only on first query)
+load_dotenv()
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app.utils import run_user_query, load_query_logs
+from app.utils import run_user_query, load_query_logs, prewarm_agent
 
 
 # ------------------------------------------------------------------------------
@@ -30,6 +34,16 @@ POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "changeme")
 CHROMA_HOST = os.getenv("CHROMA_HOST")
 CHROMA_HTTP_URL = f"http://{CHROMA_HOST}:8000"
 
+
+# Optional: load models once per worker process instead of on the first user query
+@st.cache_resource
+def prewarm_once():
+    return prewarm_agent()
+
+
+if os.getenv("PREWARM_MODELS", "false").lower() == "true":
+    prewarm_once()
+
 # ------------------------------------------------------------------------------
 # Helper: Port-level connectivity test
 # ------------------------------------------------------------------------------
@@ -139,6 +153,13 @@ if view_mode == "Query Assistant":
                 with st.expander("Generated SQL Query", expanded=True):
                     st.code(sql, language="sql")
 
+                if last_entry.get("plan_rewritten"):
+                    st.warning(
+                        "The full result was estimated to be too large, so a LIMIT was added "
+                        "(see the SQL above). Rows shown may be incomplete; refine the question "
+                        "to narrow it down."
+                    )
+
                 # Display results
                 st.dataframe(df.head(20))
 
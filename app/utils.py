@@ -2,13 +2,19 @@
 
 import json
 import pandas as pd
-from agent.text_to_sql_agent import query_agent
 
 def run_user_query(question: str):
     """Run query through the agent and return results + SQL."""
+    # Imported on first use so the app starts without loading the agent's dependencies
+    from agent.text_to_sql_agent import query_agent
     df = query_agent(question)
     return df
 
+def prewarm_agent():
+    """Load embeddings / Chroma / LLM clients ahead of the first query."""
+    from agent.text_to_sql_agent import prewarm
+    return prewarm()
+
 def load_query_logs(limit: int = 10):
     """Load recent query logs from logs/query_log.jsonl."""
     try:
@@ -17,4 +23,4 @@ def load_query_logs(limit: int = 10):
         logs = [json.loads(line) for line in lines[-limit:]]
         return pd.DataFrame(logs)
     except FileNotFoundError:
-        return pd.DataFrame(columns=["question", "sql", "rows"])
+        return pd.DataFrame(columns=["question", "sql", "rows", "plan_cost", "plan_rewritten", "runtime_ms"])
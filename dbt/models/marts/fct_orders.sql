@@ -1,23 +1,55 @@
-WITH orders AS (
+-- Incremental: only months touched by new / late-arriving orders or shipments are
+-- recomputed and swapped in (delete+insert on product_id, order_month).
+-- Use `dbt run --select fct_orders --full-refresh` to rebuild from scratch.
+{{ config(
+    materialized='incremental',
+    unique_key=['product_id', 'order_month'],
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns'
+) }}
+
+WITH
+{% if is_incremental() %}
+touched_months AS (
+    -- Months with orders or shipments loaded after the newest `_loaded_at` already
+    -- aggregated here (the ETL only re-stamps new or changed rows), found through the
+    -- stg_orders `_loaded_at` index. Deleted source rows are not detected: run
+    -- --full-refresh after removing data.
+    SELECT DISTINCT order_month
+    FROM {{ ref('stg_orders') }}
+    WHERE _loaded_at > (SELECT COALESCE(MAX(_loaded_at), '-infinity') FROM {{ this }})
+),
+{% endif %}
+orders AS (
     SELECT
         order_id,
         product_id,
         order_date,
-        total_value
+        total_value,
+        _loaded_at
     FROM {{ ref('stg_orders') }}
+    {% if is_incremental() %}
+    WHERE order_month IN (SELECT order_month FROM touched_months)
+    {% endif %}
 ),
 shipments AS (
     SELECT
+        shipment_id,
         order_id,
         shipped_date
     FROM {{ ref('stg_shipments') }}
+    {% if is_incremental() %}
+    WHERE order_id IN (SELECT order_id FROM orders)
+    {% endif %}
 )
 SELECT
     o.product_id,
     DATE_TRUNC('month', o.order_date)::date AS order_month,
     SUM(o.total_value) AS total_revenue,
     COUNT(DISTINCT o.order_id) AS total_orders,
-    AVG(DATE_PART('day', s.shipped_date - o.order_date)) AS avg_shipment_delay
+    AVG(DATE_PART('day', s.shipped_date - o.order_date)) AS avg_shipment_delay,
+    COUNT(DISTINCT s.shipment_id) AS shipments_count,
+    MAX(o._loaded_at) AS _loaded_at
 FROM orders o
 LEFT JOIN shipments s USING (order_id)
 GROUP BY o.product_id, order_month
@@ -1,9 +1,33 @@
+-- Incremental (not the staging default view) so fct_orders can hit indexes, and so
+-- a run only re-joins orders that were loaded, or whose shipments were loaded, after
+-- the newest `_loaded_at` already staged.
+{{ config(
+    materialized='incremental',
+    unique_key='order_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
+    indexes=[
+      {'columns': ['order_id']},
+      {'columns': ['order_month', 'order_id']},
+      {'columns': ['_loaded_at']},
+    ]
+) }}
+
 WITH base AS (
     SELECT * FROM {{ source('raw', 'raw_orders') }}
 ),
 ship AS (
     SELECT * FROM {{ source('raw', 'raw_shipments') }}
 )
+{% if is_incremental() %},
+changed AS (
+    SELECT order_id FROM base
+    WHERE _loaded_at > (SELECT COALESCE(MAX(_loaded_at), '-infinity') FROM {{ this }})
+    UNION
+    SELECT order_id FROM ship
+    WHERE _loaded_at > (SELECT COALESCE(MAX(_loaded_at), '-infinity') FROM {{ this }})
+)
+{% endif %}
 SELECT
     o.order_id,
     o.customer_id,
@@ -12,6 +36,11 @@ SELECT
     o.order_month,
     -- ETL uses 'order_total_usd' (we alias to total_value for consistency)
     o.order_total_usd AS total_value,
-    s.status AS shipment_status
+    s.status AS shipment_status,
+    -- Ingestion watermark: a late shipment re-stamps its (possibly old) order
+    GREATEST(o._loaded_at, s._loaded_at) AS _loaded_at
 FROM base o
 LEFT JOIN ship s ON o.order_id = s.order_id
+{% if is_incremental() %}
+WHERE o.order_id IN (SELECT order_id FROM changed)
+{% endif %}
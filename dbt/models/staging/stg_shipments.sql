@@ -1,7 +1,23 @@
+-- Incremental: only shipments loaded after the newest `_loaded_at` already staged
+{{ config(
+    materialized='incremental',
+    unique_key='shipment_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='sync_all_columns',
+    indexes=[
+      {'columns': ['order_id']},
+      {'columns': ['_loaded_at']},
+    ]
+) }}
+
 SELECT
     shipment_id,
     order_id,
     shipped_date,
     carrier,
-    status
+    status,
+    _loaded_at
 FROM {{ source('raw', 'raw_shipments') }}
+{% if is_incremental() %}
+WHERE _loaded_at > (SELECT COALESCE(MAX(_loaded_at), '-infinity') FROM {{ this }})
+{% endif %}
@@ -0,0 +1,2 @@
+-- Separate metadata database for Airflow (LocalExecutor needs Postgres, not SQLite)
+CREATE DATABASE airflow;
@@ -0,0 +1,185 @@
+# scripts/bench_fct_orders.py
+"""
+Benchmark fct_orders: full refresh vs incremental run on a generated large dataset.
+Timings are end to end (stg_orders + stg_shipments + fct_orders) for both modes.
+
+Everything runs in an isolated Postgres schema (default `bench`), so the real
+raw_* / stg_* / fct_* tables in `public` are never touched:
+
+    poetry run python -m scripts.bench_fct_orders --orders 5000000 --late-frac 0.01
+"""
+import os
+import time
+import argparse
+import logging
+import subprocess
+
+from sqlalchemy import text
+
+from scripts import etl
+from scripts.dbt_runner import PROJECT_DIR, PROFILES_DIR
+
+logger = logging.getLogger("bench_fct_orders")
+
+CARRIERS = "ARRAY['FedEx','UPS','DHL','USPS']"
+# Only the models fct_orders depends on (the scratch schema has no raw_inventory)
+STAGING = ["stg_orders", "stg_shipments"]
+
+
+def generate_raw(engine, schema, n_orders, n_products, n_customers):
+    """Create raw_orders / raw_shipments in `schema` with the columns the ETL writes (incl. `_loaded_at`)."""
+    logger.info(f"Generating {n_orders:,} orders in schema `{schema}` ...")
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text("SELECT setseed(0.42)"))
+        # Products skewed towards low SKU numbers (power-law-ish), ~3 years of order dates
+        conn.execute(text(f"""
+            CREATE TABLE {schema}.raw_orders AS
+            SELECT
+                'O' || g AS order_id,
+                'C' || CAST(1 + floor(random() * :n_customers) AS int) AS customer_id,
+                'SKU-' || lpad(CAST(1 + floor(power(random(), 3) * :n_products) AS int)::text, 5, '0') AS product_id,
+                ts AS order_date,
+                CAST(round(CAST(5 + random() * 495 AS numeric), 2) AS double precision) AS order_total_usd,
+                to_char(ts, 'YYYY-MM') AS order_month,
+                LOCALTIMESTAMP AS _loaded_at
+            FROM (
+                SELECT g, date_trunc('day', TIMESTAMP '2022-01-01' + random() * INTERVAL '1095 days') AS ts
+                FROM generate_series(1, :n_orders) g
+            ) t
+        """), {"n_orders": n_orders, "n_products": n_products, "n_customers": n_customers})
+        # ~95% of orders shipped 1-10 days later
+        conn.execute(text(f"""
+            CREATE TABLE {schema}.raw_shipments AS
+            SELECT
+                row_number() OVER () AS shipment_id,
+                order_id,
+                order_date + CAST(1 + floor(random() * 10) AS int) * INTERVAL '1 day' AS shipped_date,
+                'delivered' AS status,
+                ({CARRIERS})[1 + floor(random() * 4)] AS carrier,
+                LOCALTIMESTAMP AS _loaded_at
+            FROM {schema}.raw_orders
+            WHERE random() < 0.95
+        """))
+        # Same indexes as etl.load_to_postgres
+        for table, columns in etl.RAW_INDEXES.items():
+            for column in columns:
+                conn.execute(text(f"CREATE INDEX ON {schema}.{table} ({column})"))
+
+
+def add_late_data(engine, schema, n_orders, late_frac):
+    """
+    Append new orders (latest month) and late shipments for previously unshipped orders
+    in older months. Half of the late shipments are dated shortly after their order,
+    i.e. well before the newest shipment already loaded, so the incremental model
+    must detect them by ingestion time (`_loaded_at`) rather than by shipped_date.
+    """
+    n_late = max(1, int(n_orders * late_frac))
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            INSERT INTO {schema}.raw_orders
+            SELECT
+                'O' || (:n_orders + g),
+                'C' || g,
+                'SKU-00001',
+                ts,
+                99.0,
+                to_char(ts, 'YYYY-MM'),
+                LOCALTIMESTAMP
+            FROM (
+                SELECT g, (SELECT date_trunc('month', MAX(order_date)) FROM {schema}.raw_orders) AS ts
+                FROM generate_series(1, :n_late) g
+            ) t
+        """), {"n_orders": n_orders, "n_late": n_late})
+        conn.execute(text(f"""
+            INSERT INTO {schema}.raw_shipments
+            SELECT
+                (SELECT MAX(shipment_id) FROM {schema}.raw_shipments) + row_number() OVER (),
+                o.order_id,
+                CASE WHEN row_number() OVER () % 2 = 0
+                    THEN (SELECT MAX(shipped_date) FROM {schema}.raw_shipments) + INTERVAL '1 day'
+                    ELSE o.order_date + CAST(2 + floor(random() * 4) AS int) * INTERVAL '1 day'
+                END,
+                'delivered',
+                'UPS',
+                LOCALTIMESTAMP
+            FROM (
+                SELECT o.order_id, o.order_date
+                FROM {schema}.raw_orders o
+                LEFT JOIN {schema}.raw_shipments s USING (order_id)
+                WHERE s.order_id IS NULL
+                  AND o.order_date < (SELECT date_trunc('month', MAX(order_date)) FROM {schema}.raw_orders)
+                ORDER BY random()
+                LIMIT :n_late
+            ) o
+        """), {"n_late": n_late})
+    return n_late
+
+
+def dbt(args, schema):
+    """Run a dbt command against `schema` and return wall-clock seconds."""
+    cmd = ["dbt", "run", *args, "--project-dir", PROJECT_DIR, "--profiles-dir", PROFILES_DIR,
+           "--vars", f"{{raw_schema: {schema}}}"]
+    env = {**os.environ, "DBT_SCHEMA": schema}
+    start = time.perf_counter()
+    subprocess.run(cmd, cwd=PROJECT_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def build(results, prefix, schema, full_refresh=False):
+    """
+    dbt run the staging models, then fct_orders. Records both stages and their sum
+    (`<prefix>_s`), so full refresh and incremental are compared end to end.
+    """
+    flags = ["--full-refresh"] if full_refresh else []
+    results[f"{prefix}_staging_s"] = dbt(["--select", *STAGING, *flags], schema)
+    results[f"{prefix}_fct_s"] = dbt(["--select", "fct_orders", *flags], schema)
+    results[f"{prefix}_s"] = results[f"{prefix}_staging_s"] + results[f"{prefix}_fct_s"]
+
+
+def checksum(engine, schema):
+    with engine.connect() as conn:
+        return conn.execute(text(f"""
+            SELECT COUNT(*), SUM(total_orders), ROUND(CAST(SUM(total_revenue) AS numeric), 2),
+                   ROUND(CAST(SUM(COALESCE(avg_shipment_delay, 0) * total_orders) AS numeric), 2),
+                   SUM(shipments_count),
+                   (SELECT COUNT(*) FROM {schema}.stg_orders),
+                   (SELECT COUNT(*) FROM {schema}.stg_shipments)
+            FROM {schema}.fct_orders
+        """)).fetchone()
+
+
+def run_benchmark(n_orders, late_frac, schema="bench", keep=False):
+    engine = etl.pg_engine()
+    generate_raw(engine, schema, n_orders, n_products=max(10, n_orders // 1000), n_customers=max(100, n_orders // 20))
+
+    results = {"orders": n_orders}
+    build(results, "full_refresh", schema, full_refresh=True)
+
+    results["late_rows"] = add_late_data(engine, schema, n_orders, late_frac)
+    build(results, "incremental", schema)
+    incremental_sum = checksum(engine, schema)
+
+    # Sanity check: incremental result must match a from-scratch rebuild
+    build(results, "full_refresh_after_late", schema, full_refresh=True)
+    results["consistent"] = incremental_sum == checksum(engine, schema)
+    results["speedup"] = round(results["full_refresh_after_late_s"] / results["incremental_s"], 2)
+
+    if not keep:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fct_orders full vs incremental dbt runs")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="Number of generated orders")
+    parser.add_argument("--late-frac", type=float, default=0.01, help="Fraction of late-arriving orders/shipments")
+    parser.add_argument("--schema", default="bench", help="Scratch schema (dropped and recreated)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema after the run")
+    args = parser.parse_args()
+
+    res = run_benchmark(args.orders, args.late_frac, args.schema, args.keep)
+    for k, v in res.items():
+        print(f"{k:>34}: {v:.3f}" if isinstance(v, float) else f"{k:>34}: {v}")
@@ -0,0 +1,66 @@
+# scripts/bench_import_time.py
+"""
+Startup-time benchmark based on `python -X importtime`.
+
+Imports each module in a fresh interpreter and reports the total import time
+plus the heaviest top-level dependencies:
+
+    poetry run python -m scripts.bench_import_time
+    poetry run python -m scripts.bench_import_time agent.text_to_sql_agent --top 15
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_MODULES = ["agent.sql_validator", "agent.text_to_sql_agent", "app.utils"]
+
+# import time:       self [us] |  cumulative | imported package
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_time(module: str, prewarm: bool = False) -> list:
+    """Return [(package, cumulative_us, depth)] for importing `module` in a fresh interpreter."""
+    code = f"import {module}"
+    if prewarm:
+        code += "; from agent.text_to_sql_agent import get_embeddings, get_llm; get_embeddings(); get_llm()"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            # importtime indents nested imports by two spaces per level
+            rows.append((m.group(4), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return rows
+
+
+def summarize(module: str, rows: list, top: int = 10):
+    total_us = sum(cum for _, cum, depth in rows if depth == 0)
+    print(f"\n{module}: {total_us / 1000:.1f} ms total import time")
+    # Heaviest third-party / sibling packages: cumulative time of each top-level package import
+    own_root = module.split(".")[0]
+    packages = {}
+    for name, cum, _ in rows:
+        if "." not in name and name != own_root:
+            packages[name] = max(cum, packages.get(name, 0))
+    for name, cum in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {cum / 1000:>9.1f} ms  {name}")
+    return total_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure module import time with python -X importtime")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Number of heaviest top-level imports to show")
+    parser.add_argument("--prewarm", action="store_true", help="Also load embeddings and LLM client (full warm start)")
+    args = parser.parse_args()
+
+    for mod in args.modules:
+        summarize(mod, import_time(mod, args.prewarm), args.top)
@@ -0,0 +1,109 @@
+# scripts/benchmark.py
+"""
+Scale benchmark: generate data at several sizes and time each pipeline stage.
+
+Stages: run_checks -> run_etl -> dbt run -> query_agent. ETL, dbt and the agent all
+work in a scratch Postgres schema (default `bench_scale`, dropped afterwards unless
+--keep), so the real raw_* / stg_* / fct_* tables in `public` are never touched:
+
+    poetry run python -m scripts.benchmark --scales 1e3 1e5 1e6 --skip-agent
+"""
+import os
+import time
+import argparse
+import logging
+import subprocess
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+
+from scripts import generate_data, ge_checks, etl
+from scripts.dbt_runner import PROJECT_DIR, PROFILES_DIR
+
+logger = logging.getLogger("benchmark")
+
+DEFAULT_QUESTION = "Show total revenue by order month"
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn and return (seconds, error message or None)."""
+    start = time.perf_counter()
+    try:
+        fn(*args, **kwargs)
+        return time.perf_counter() - start, None
+    except Exception as e:
+        logger.warning(f"{getattr(fn, '__name__', fn)} failed: {e}")
+        return time.perf_counter() - start, str(e)
+
+
+def run_dbt_full_refresh(schema):
+    """Build every model into `schema` from the raw tables in that same schema."""
+    subprocess.run(
+        ["dbt", "run", "--full-refresh", "--project-dir", PROJECT_DIR, "--profiles-dir", PROFILES_DIR,
+         "--vars", f"{{raw_schema: {schema}}}"],
+        cwd=PROJECT_DIR, env={**os.environ, "DBT_SCHEMA": schema}, check=True, stdout=subprocess.DEVNULL,
+    )
+
+
+def run_agent(question, schema):
+    from agent.text_to_sql_agent import query_agent
+    # libpq reads PGOPTIONS when the agent's engine opens its connections
+    previous = os.environ.get("PGOPTIONS")
+    os.environ["PGOPTIONS"] = f"-csearch_path={schema}"
+    try:
+        query_agent(question)
+    finally:
+        if previous is None:
+            os.environ.pop("PGOPTIONS", None)
+        else:
+            os.environ["PGOPTIONS"] = previous
+
+
+def benchmark_scale(rows, work_dir, schema, seed=42, skip_dbt=False, skip_agent=False, question=DEFAULT_QUESTION):
+    data_dir = os.path.join(work_dir, f"scale_{rows}")
+    gen_s, _ = timed(generate_data.generate, rows, data_dir, "csv", seed)
+
+    row = {"rows": rows, "generate_s": gen_s}
+    row["run_checks_s"], row["run_checks_error"] = timed(ge_checks.run_checks, data_dir)
+    row["run_etl_s"], row["run_etl_error"] = timed(etl.run_etl, data_dir, schema)
+    if not skip_dbt:
+        row["dbt_run_s"], row["dbt_run_error"] = timed(run_dbt_full_refresh, schema)
+    if not skip_agent:
+        row["query_agent_s"], row["query_agent_error"] = timed(run_agent, question, schema)
+    return row
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Time ETL, dbt and the query agent at several data scales")
+    parser.add_argument("--scales", type=float, nargs="+", default=[1e3, 1e4, 1e5])
+    parser.add_argument("--work-dir", default="data/bench")
+    parser.add_argument("--schema", default="bench_scale", help="Scratch schema (dropped and recreated)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema after the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--question", default=DEFAULT_QUESTION)
+    parser.add_argument("--skip-dbt", action="store_true")
+    parser.add_argument("--skip-agent", action="store_true", help="Skip query_agent (needs Chroma + LLM)")
+    args = parser.parse_args()
+    if args.schema == "public":
+        parser.error("--schema must be a scratch schema, not `public`")
+
+    engine = etl.pg_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {args.schema}"))
+    try:
+        results = pd.DataFrame([
+            benchmark_scale(int(s), args.work_dir, args.schema, args.seed, args.skip_dbt, args.skip_agent, args.question)
+            for s in args.scales
+        ])
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+    os.makedirs(etl.OUTPUT_DIR, exist_ok=True)
+    out_path = os.path.join(etl.OUTPUT_DIR, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    results.to_csv(out_path, index=False)
+    print(results.to_string(index=False))
+    print(f"Results written to {out_path}")
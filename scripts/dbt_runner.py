@@ -0,0 +1,53 @@
+# scripts/dbt_runner.py
+import os
+import glob
+import logging
+import subprocess
+
+from scripts import etl, pipeline_state
+
+logger = logging.getLogger("dbt_runner")
+
+PROJECT_DIR = os.getenv("PROJECT_DIR", os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+PROFILES_DIR = os.getenv("DBT_PROFILES_DIR", os.path.join(PROJECT_DIR, "dbt"))
+MODELS_DIR = os.path.join(PROJECT_DIR, "dbt", "models")
+MACROS_DIR = os.path.join(PROJECT_DIR, "dbt", "macros")
+
+
+def project_files() -> list:
+    """Project-wide files that affect every layer: dbt_project.yml, profiles.yml and macros."""
+    files = [os.path.join(PROJECT_DIR, "dbt_project.yml"), os.path.join(PROFILES_DIR, "profiles.yml")]
+    files += glob.glob(os.path.join(MACROS_DIR, "**", "*.sql"), recursive=True)
+    return [f for f in files if os.path.exists(f)]
+
+
+def layer_hash(layer: str) -> str:
+    """Content hash of every model / schema file in a dbt layer folder (staging, marts) plus the project files."""
+    files = glob.glob(os.path.join(MODELS_DIR, layer, "*.sql")) + glob.glob(os.path.join(MODELS_DIR, layer, "*.yml"))
+    return pipeline_state.hash_files(files + project_files())
+
+
+def run_layer(layer: str, upstream_digest: str, force: bool = False) -> dict:
+    """
+    `dbt run` a single model layer.
+    Skipped when neither the layer's SQL, the project config nor its upstream inputs
+    changed since the last successful run.
+    """
+    key = f"dbt_{layer}"
+    engine = etl.pg_engine()
+    digest = pipeline_state.combine(layer_hash(layer), upstream_digest)
+    if not force and pipeline_state.is_unchanged(engine, key, digest):
+        logger.info(f"⏭️ dbt layer `{layer}` unchanged (sha256 {digest[:12]}), skipping run.")
+        return {"layer": layer, "skipped": True, "hash": digest}
+
+    cmd = [
+        "dbt", "run",
+        "--select", f"path:dbt/models/{layer}",
+        "--project-dir", PROJECT_DIR,
+        "--profiles-dir", PROFILES_DIR,
+    ]
+    logger.info(f"Running: {' '.join(cmd)}")
+    subprocess.run(cmd, cwd=PROJECT_DIR, check=True)
+
+    pipeline_state.mark_done(engine, key, digest)
+    return {"layer": layer, "skipped": False, "hash": digest}
@@ -1,10 +1,12 @@
 # scripts/etl.py
 import os
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
 import logging
 from datetime import datetime
 
+from scripts import pipeline_state
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("etl")
 
@@ -20,24 +22,53 @@ OUTPUT_DIR = os.getenv("OUTPUT_DIR", "outputs")
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# table name -> (source csv, target raw table, date columns)
+TABLES = {
+    "orders": ("orders.csv", "raw_orders", ["order_date"]),
+    "shipments": ("shipments.csv", "raw_shipments", ["shipped_date"]),
+    "inventory": ("inventory.csv", "raw_inventory", None),
+}
+
+# raw table -> row key; these tables carry the `_loaded_at` ingestion watermark
+# the incremental dbt models use to find new / late-arriving rows
+ROW_KEYS = {
+    "raw_orders": "order_id",
+    "raw_shipments": "shipment_id",
+}
+# Columns the incremental staging models filter / join raw tables on
+RAW_INDEXES = {
+    "raw_orders": ["_loaded_at", "order_id"],
+    "raw_shipments": ["_loaded_at", "order_id"],
+}
+
 # --- DB CONNECTION ---
-def pg_engine():
+def pg_engine(schema=None):
+    """Engine for the configured database; `schema` (if given) becomes the search_path, i.e. the load target."""
     url = f"postgresql://{PG_USER}:{PG_PASS}@{PG_HOST}:{PG_PORT}/{PG_DB}"
-    logger.info(f"Connecting to Postgres at {PG_HOST}:{PG_PORT}/{PG_DB}")
-    return create_engine(url, echo=False)
+    logger.info(f"Connecting to Postgres at {PG_HOST}:{PG_PORT}/{PG_DB}" + (f" (schema {schema})" if schema else ""))
+    connect_args = {"options": f"-csearch_path={schema}"} if schema else {}
+    return create_engine(url, echo=False, connect_args=connect_args)
 
 # --- READ DATA ---
-def read_csvs():
-    logger.info(f"Reading CSVs from {DATA_DIR}")
-    orders = pd.read_csv(os.path.join(DATA_DIR, "orders.csv"), parse_dates=["order_date"])
-    shipments = pd.read_csv(os.path.join(DATA_DIR, "shipments.csv"), parse_dates=["shipped_date"])
-    inventory = pd.read_csv(os.path.join(DATA_DIR, "inventory.csv"))
+def read_csvs(data_dir=DATA_DIR):
+    logger.info(f"Reading CSVs from {data_dir}")
+    orders = pd.read_csv(os.path.join(data_dir, "orders.csv"), parse_dates=["order_date"])
+    shipments = pd.read_csv(os.path.join(data_dir, "shipments.csv"), parse_dates=["shipped_date"])
+    inventory = pd.read_csv(os.path.join(data_dir, "inventory.csv"))
     return orders, shipments, inventory
 
-# --- TRANSFORM ---
-def transform(orders, shipments, inventory):
-    logger.info("Starting transformation logic")
+def read_table(name):
+    csv_name, _, date_cols = TABLES[name]
+    path = os.path.join(DATA_DIR, csv_name)
+    logger.info(f"Reading {path}")
+    return pd.read_csv(path, parse_dates=date_cols)
+
+def source_hash(name):
+    """Content hash of the source CSV backing `name`."""
+    return pipeline_state.hash_files([os.path.join(DATA_DIR, TABLES[name][0])])
 
+# --- TRANSFORM ---
+def transform_orders(orders):
     # Rename for consistency (future-proof)
     if "total_value" in orders.columns:
         orders = orders.rename(columns={"total_value": "order_total_usd"})
@@ -48,9 +79,31 @@ def transform(orders, shipments, inventory):
 
     # Extract month
     orders["order_month"] = orders["order_date"].dt.to_period("M").astype(str)
+    return orders
 
+def transform_shipments(shipments):
     # Filter shipment fields
-    shipments_small = shipments[["shipment_id", "order_id", "shipped_date", "status", "carrier"]]
+    return shipments[["shipment_id", "order_id", "shipped_date", "status", "carrier"]]
+
+def transform_inventory(inventory):
+    # Normalize product keys
+    if "product_id" not in inventory.columns:
+        inventory["product_id"] = inventory["sku"]
+    # Inventory: add reorder flag
+    inventory["reorder_needed"] = inventory["stock_level"] <= inventory["reorder_point"]
+    return inventory
+
+TRANSFORMS = {
+    "orders": transform_orders,
+    "shipments": transform_shipments,
+    "inventory": transform_inventory,
+}
+
+def transform(orders, shipments, inventory):
+    logger.info("Starting transformation logic")
+
+    orders = transform_orders(orders)
+    shipments_small = transform_shipments(shipments)
 
     # Merge order + shipment info (left join)
     orders_ship = orders.merge(
@@ -58,18 +111,54 @@ def transform(orders, shipments, inventory):
         on="order_id", how="left"
     )
 
-    # Inventory: add reorder flag
-    inventory["reorder_needed"] = inventory["stock_level"] <= inventory["reorder_point"]
+    inventory = transform_inventory(inventory)
 
     logger.info("Transformations complete")
     return orders, shipments_small, inventory, orders_ship
 
 # --- LOAD TO POSTGRES ---
-def load_to_postgres(df, table_name, engine):
+def stamp_loaded_at(df, table_name, conn, loaded_at=None):
+    """
+    Add `_row_hash` and `_loaded_at` to a raw table about to be replaced.
+    Rows identical to the currently loaded ones keep their `_loaded_at`; new or
+    changed rows get `loaded_at` (now), so downstream models only need the rows
+    past their stored watermark even though the table itself is fully rewritten.
+    """
+    key = ROW_KEYS[table_name]
+    loaded_at = loaded_at or pd.Timestamp.now(tz="UTC").tz_localize(None)
+    df = df.copy()
+    df["_row_hash"] = pd.util.hash_pandas_object(df, index=False).astype("int64")
+
+    insp = inspect(conn)
+    prev_cols = {c["name"] for c in insp.get_columns(table_name)} if insp.has_table(table_name) else set()
+    if {key, "_row_hash", "_loaded_at"} <= prev_cols:
+        prev = pd.read_sql(
+            text(f"SELECT {key}, _row_hash, _loaded_at FROM {table_name}"), conn, parse_dates=["_loaded_at"]
+        )
+        df = df.merge(prev.drop_duplicates([key, "_row_hash"]), on=[key, "_row_hash"], how="left")
+    else:
+        df["_loaded_at"] = pd.NaT
+    df["_loaded_at"] = df["_loaded_at"].fillna(loaded_at)
+    return df
+
+def load_to_postgres(df, table_name, engine, digest=None):
+    """
+    Replace `table_name` with `df` in one transaction.
+    If `digest` is given it is recorded in pipeline_state in that same transaction,
+    so the skip state can never outlive (or run ahead of) the loaded data.
+    """
     logger.info(f"Loading {len(df)} rows into table `{table_name}` ...")
+    if digest:
+        pipeline_state.ensure_table(engine)
     with engine.begin() as conn:
+        if table_name in ROW_KEYS:
+            df = stamp_loaded_at(df, table_name, conn)
         conn.execute(text(f"DROP TABLE IF EXISTS {table_name} CASCADE;"))
-    df.to_sql(table_name, engine, if_exists="replace", index=False)
+        df.to_sql(table_name, conn, if_exists="replace", index=False)
+        for column in RAW_INDEXES.get(table_name, []):
+            conn.execute(text(f"CREATE INDEX ON {table_name} ({column});"))
+        if digest:
+            pipeline_state.mark_done(conn, table_name, digest)
     logger.info(f"✅ Table `{table_name}` rebuilt successfully.")
 
 
@@ -87,14 +176,13 @@ def save_outputs(orders_ship, output_dir=OUTPUT_DIR):
     return out_path, agg
 
 # --- MAIN PIPELINE ---
-def run_etl():
+def run_etl(data_dir=DATA_DIR, schema=None):
+    """Load every CSV in `data_dir` into the raw tables of `schema` (default: search_path of the DB user)."""
     logger.info("ETL started")
-    engine = pg_engine()
+    engine = pg_engine(schema)
 
-    orders, shipments, inventory = read_csvs()
+    orders, shipments, inventory = read_csvs(data_dir)
 
-    # Normalize product keys
-    inventory["product_id"] = inventory["sku"]
     orders, shipments_small, inventory, orders_ship = transform(orders, shipments, inventory)
 
     # Load staging tables
@@ -106,6 +194,29 @@ def run_etl():
     logger.info("🎯 ETL finished successfully")
     return {"output_path": out_path, "agg_preview": agg.to_dict(orient="records")}
 
+# --- PER-TABLE PIPELINE (Airflow fan-out) ---
+def load_table(name, force=False):
+    """
+    Read, transform and load a single raw table.
+    Idempotent: the table is fully replaced, and the load is skipped when the
+    source CSV content hash matches the last successful load recorded in Postgres.
+    """
+    _, table_name, _ = TABLES[name]
+    engine = pg_engine()
+    digest = source_hash(name)
+    if not force and pipeline_state.is_unchanged(engine, table_name, digest):
+        logger.info(f"⏭️ `{table_name}` unchanged (sha256 {digest[:12]}), skipping load.")
+        return {"table": table_name, "skipped": True, "hash": digest}
+
+    df = TRANSFORMS[name](read_table(name))
+    load_to_postgres(df, table_name, engine, digest)
+
+    res = {"table": table_name, "skipped": False, "hash": digest, "rows": len(df)}
+    if name == "orders":
+        out_path, _ = save_outputs(df)
+        res["output_path"] = out_path
+    return res
+
 if __name__ == "__main__":
     res = run_etl()
     print("ETL result:", res)
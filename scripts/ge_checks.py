@@ -48,11 +48,23 @@ def check_inventory(df: pd.DataFrame):
     assert pd.api.types.is_numeric_dtype(df["reorder_point"]), "reorder_point must be numeric"
     assert (df["reorder_point"] >= 0).all(), "Negative reorder_point values found"
 
-def run_checks():
+CHECKS = {
+    "orders": ("orders.csv", check_orders),
+    "shipments": ("shipments.csv", check_shipments),
+    "inventory": ("inventory.csv", check_inventory),
+}
+
+def check_table(name: str):
+    """Run the validation check for a single source table."""
+    csv_name, check = CHECKS[name]
+    check(pd.read_csv(os.path.join(DATA_DIR, csv_name)))
+    print(f"Checks passed for {csv_name}")
+
+def run_checks(data_dir=DATA_DIR):
     """Run all validation checks."""
-    orders = pd.read_csv(os.path.join(DATA_DIR, "orders.csv"))
-    shipments = pd.read_csv(os.path.join(DATA_DIR, "shipments.csv"))
-    inventory = pd.read_csv(os.path.join(DATA_DIR, "inventory.csv"))
+    orders = pd.read_csv(os.path.join(data_dir, "orders.csv"))
+    shipments = pd.read_csv(os.path.join(data_dir, "shipments.csv"))
+    inventory = pd.read_csv(os.path.join(data_dir, "inventory.csv"))
 
     check_orders(orders)
     check_shipments(shipments)
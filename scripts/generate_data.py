@@ -0,0 +1,185 @@
+# scripts/generate_data.py
+"""
+Seeded synthetic data generator for load / scale testing.
+
+Writes orders, shipments and inventory in the same layout as data/*.csv, with
+Zipf-skewed product and customer popularity. Output is streamed chunk by chunk,
+so memory stays flat from 1e3 up to 1e8 rows. The same seed and chunk size
+always produce identical files:
+
+    poetry run python -m scripts.generate_data --rows 1e7 --out-dir data/scale_1e7 --format parquet
+"""
+import os
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger("generate_data")
+
+CARRIERS = np.array(["FedEx", "UPS", "DHL", "USPS"])
+CARRIER_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+START_DATE = np.datetime64("2022-01-01")
+
+
+class ChunkWriter:
+    """Append DataFrame chunks to a single CSV or Parquet file."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.fmt = fmt
+        self._parquet = None
+        self._first = True
+        if fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Parquet output needs pyarrow: poetry add --group dev pyarrow")
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv":
+            df.to_csv(self.path, mode="w" if self._first else "a", header=self._first, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def zipf_sampler(n: int, s: float, rng: np.random.Generator):
+    """Return a function drawing `size` ids in [0, n) with P(i) ∝ 1 / (i + 1) ** s."""
+    cdf = np.cumsum(1.0 / np.arange(1, n + 1) ** s)
+    cdf /= cdf[-1]
+    # Shuffle ranks so the popular ids are not simply the lowest numbers
+    ranks = rng.permutation(n)
+    return lambda size: ranks[np.searchsorted(cdf, rng.random(size), side="right").clip(max=n - 1)]
+
+
+def default_sizes(rows: int):
+    n_products = int(min(max(rows // 1000, 50), 100_000))
+    n_customers = int(min(max(rows // 20, 100), 5_000_000))
+    return n_products, n_customers
+
+
+def generate(
+    rows: int,
+    out_dir: str = "data/generated",
+    fmt: str = "csv",
+    seed: int = 42,
+    chunk_size: int = 500_000,
+    days: int = 1095,
+    n_products: int = None,
+    n_customers: int = None,
+    skew: float = 1.1,
+) -> dict:
+    """
+    Generate `rows` orders plus matching shipments and an inventory snapshot.
+    Returns the written file paths and row counts.
+    """
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported format: {fmt}")
+    rng = np.random.default_rng(seed)
+    default_products, default_customers = default_sizes(rows)
+    n_products = n_products or default_products
+    n_customers = n_customers or default_customers
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {name: os.path.join(out_dir, f"{name}.{fmt}") for name in ("orders", "shipments", "inventory")}
+
+    # --- INVENTORY (one row per product, small enough to build in one go) ---
+    skus = np.char.add("SKU-", np.char.zfill(np.arange(1, n_products + 1).astype(str), 6))
+    unit_price = np.round(rng.lognormal(mean=3.5, sigma=0.8, size=n_products), 2)
+    reorder_point = rng.integers(10, 200, size=n_products)
+    inventory = pd.DataFrame({
+        "sku": skus,
+        "product_name": np.char.add("Product ", np.arange(1, n_products + 1).astype(str)),
+        "stock_level": (reorder_point * rng.uniform(0.2, 5.0, size=n_products)).astype(int),
+        "reorder_point": reorder_point,
+    })
+    inv_writer = ChunkWriter(paths["inventory"], fmt)
+    inv_writer.write(inventory)
+    inv_writer.close()
+
+    # --- ORDERS + SHIPMENTS (streamed) ---
+    pick_product = zipf_sampler(n_products, skew, rng)
+    pick_customer = zipf_sampler(n_customers, skew * 0.8, rng)
+    end_date = START_DATE + np.timedelta64(days, "D")
+    orders_writer = ChunkWriter(paths["orders"], fmt)
+    shipments_writer = ChunkWriter(paths["shipments"], fmt)
+    n_shipments = 0
+
+    try:
+        for start in range(0, rows, chunk_size):
+            size = min(chunk_size, rows - start)
+            ids = np.arange(start + 1, start + size + 1)
+
+            # Order dates advance with order_id (plus jitter), like a real append-only feed
+            day = (ids / rows * days + rng.normal(0, 2, size)).clip(0, days - 1).astype(int)
+            order_date = START_DATE + day.astype("timedelta64[D]")
+            product = pick_product(size)
+            quantity = rng.geometric(0.6, size)
+
+            orders_writer.write(pd.DataFrame({
+                "order_id": np.char.add("O", ids.astype(str)),
+                "customer_id": np.char.add("C", (pick_customer(size) + 1).astype(str)),
+                "product_id": skus[product],
+                "order_date": order_date,
+                "total_value": np.round(unit_price[product] * quantity, 2),
+            }))
+
+            # ~97% of orders ship, 0-14 days later (long tail = late arrivals)
+            shipped = rng.random(size) < 0.97
+            n = int(shipped.sum())
+            shipped_date = order_date[shipped] + rng.poisson(2, n).clip(max=14).astype("timedelta64[D]")
+            status = np.where(
+                shipped_date < end_date - np.timedelta64(7, "D"),
+                "delivered",
+                np.where(rng.random(n) < 0.8, "in_transit", "pending"),
+            )
+            shipment_ids = np.arange(n_shipments + 1, n_shipments + n + 1)
+            shipments_writer.write(pd.DataFrame({
+                "shipment_id": shipment_ids,
+                "order_id": np.char.add("O", ids[shipped].astype(str)),
+                "shipped_date": shipped_date,
+                "carrier": rng.choice(CARRIERS, n, p=CARRIER_WEIGHTS),
+                "tracking_number": np.char.add("TRK", shipment_ids.astype(str)),
+                "status": status,
+            }))
+            n_shipments += n
+            logger.info(f"Generated {start + size:,}/{rows:,} orders")
+    finally:
+        orders_writer.close()
+        shipments_writer.close()
+
+    return {
+        "paths": paths,
+        "orders": rows,
+        "shipments": n_shipments,
+        "inventory": n_products,
+        "customers": n_customers,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Generate synthetic orders/shipments/inventory data")
+    parser.add_argument("--rows", type=float, default=1e5, help="Number of orders (1e3 .. 1e8)")
+    parser.add_argument("--out-dir", default="data/generated")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=500_000)
+    parser.add_argument("--days", type=int, default=1095, help="Span of order dates in days")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for product popularity")
+    args = parser.parse_args()
+
+    res = generate(
+        int(args.rows), args.out_dir, args.format, args.seed, args.chunk_size, args.days, skew=args.skew
+    )
+    print("Generated:", res)
@@ -0,0 +1,97 @@
+# scripts/pipeline_state.py
+"""
+Content-hash bookkeeping for the Airflow tasks.
+
+Digests live in a `pipeline_state` table in the same database as the data they
+describe, so wiping the database (e.g. `docker compose down -v`) also forgets
+them and every task reruns instead of skipping over missing tables.
+"""
+import os
+import json
+import hashlib
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+STATE_TABLE = "pipeline_state"
+
+
+def hash_files(paths) -> str:
+    """Return a single sha256 digest over the contents of the given files (order-insensitive)."""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_json(obj) -> str:
+    """Return a sha256 digest of a JSON-serialisable object (key order does not matter)."""
+    payload = json.dumps(obj, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def combine(*digests) -> str:
+    """Combine several digests into one, e.g. upstream table hashes + model SQL hash."""
+    return hashlib.sha256("".join(d or "" for d in digests).encode()).hexdigest()
+
+
+@contextmanager
+def _connect(bind):
+    """Use `bind` as is if it is a Connection (caller's transaction), else open a transaction on the Engine."""
+    if isinstance(bind, Engine):
+        with bind.begin() as conn:
+            yield conn
+    else:
+        yield bind
+
+
+def ensure_table(engine):
+    """Create the state table if needed (before opening a load transaction that records into it)."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                    key VARCHAR(255) PRIMARY KEY,
+                    digest VARCHAR(64) NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+    except DBAPIError:
+        # A parallel task created it at the same moment
+        if not inspect(engine).has_table(STATE_TABLE):
+            raise
+
+
+def get_state(bind, key: str):
+    """Return the digest recorded by the last successful run of `key`, or None."""
+    with _connect(bind) as conn:
+        if not inspect(conn).has_table(STATE_TABLE):
+            return None
+        return conn.execute(
+            text(f"SELECT digest FROM {STATE_TABLE} WHERE key = :key"), {"key": key}
+        ).scalar()
+
+
+def is_unchanged(bind, key: str, digest: str) -> bool:
+    """True if `key` already completed successfully for exactly this input digest."""
+    return get_state(bind, key) == digest
+
+
+def mark_done(bind, key: str, digest: str):
+    """
+    Record `digest` for `key`. Pass the load's Connection to commit the state
+    together with the data it describes (call `ensure_table` first).
+    """
+    if isinstance(bind, Engine):
+        ensure_table(bind)
+    with _connect(bind) as conn:
+        conn.execute(text(f"""
+            INSERT INTO {STATE_TABLE} (key, digest, updated_at)
+            VALUES (:key, :digest, CURRENT_TIMESTAMP)
+            ON CONFLICT (key) DO UPDATE SET digest = excluded.digest, updated_at = excluded.updated_at
+        """), {"key": key, "digest": digest})
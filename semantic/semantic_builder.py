@@ -38,10 +38,14 @@ def merge_semantic_with_dbt(semantic, dbt_models):
     merged["joins"] = semantic.get("joins", [])
     return merged
 
+def write_merged(merged, out_path="semantic/merged_semantic.json"):
+    out_path = Path(out_path)
+    out_path.write_text(json.dumps(merged, indent=2))
+    print(f"Merged semantic layer written to {out_path}")
+    return out_path
+
 if __name__ == "__main__":
     dbt_models = extract_dbt_metadata()
     semantic = load_semantic_layer()
     merged = merge_semantic_with_dbt(semantic, dbt_models)
-    out_path = Path("semantic/merged_semantic.json")
-    out_path.write_text(json.dumps(merged, indent=2))
-    print(f"Merged semantic layer written to {out_path}")
+    write_merged(merged)
@@ -12,3 +12,20 @@ def test_run_etl_creates_output(tmp_path):
     # agg_preview should be non-empty
     assert isinstance(res["agg_preview"], list)
     assert len(res["agg_preview"]) >= 1
+
+def test_stamp_loaded_at_keeps_unchanged_rows(tmp_path):
+    import pandas as pd
+    from sqlalchemy import create_engine
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}")
+    first = pd.Timestamp("2025-01-01")
+    shipments = pd.DataFrame({"shipment_id": [1, 2], "order_id": ["O1", "O2"], "status": ["pending", "pending"]})
+    with engine.begin() as conn:
+        etl.stamp_loaded_at(shipments, "raw_shipments", conn, first).to_sql("raw_shipments", conn, index=False)
+
+    # Shipment 2 changed, shipment 3 arrived late: only those get the new watermark
+    shipments = pd.DataFrame({"shipment_id": [1, 2, 3], "order_id": ["O1", "O2", "O3"],
+                              "status": ["pending", "delivered", "pending"]})
+    with engine.begin() as conn:
+        res = etl.stamp_loaded_at(shipments, "raw_shipments", conn, pd.Timestamp("2025-02-01"))
+    assert res["_loaded_at"].tolist() == [first, pd.Timestamp("2025-02-01"), pd.Timestamp("2025-02-01")]
@@ -0,0 +1,26 @@
+import pandas as pd
+from scripts import generate_data, ge_checks
+
+
+def test_generate_matches_source_schema(tmp_path):
+    res = generate_data.generate(2000, str(tmp_path), chunk_size=700, seed=7)
+    assert res["orders"] == 2000
+
+    orders = pd.read_csv(res["paths"]["orders"])
+    shipments = pd.read_csv(res["paths"]["shipments"])
+    inventory = pd.read_csv(res["paths"]["inventory"])
+    assert len(orders) == 2000
+    assert len(shipments) == res["shipments"]
+    assert set(shipments["order_id"]) <= set(orders["order_id"])
+    assert set(orders["product_id"]) <= set(inventory["sku"])
+
+    # Generated data must pass the same checks as data/*.csv
+    ge_checks.check_orders(orders)
+    ge_checks.check_shipments(shipments)
+    ge_checks.check_inventory(inventory)
+
+
+def test_generate_is_seeded(tmp_path):
+    a = generate_data.generate(500, str(tmp_path / "a"), chunk_size=200, seed=1)
+    b = generate_data.generate(500, str(tmp_path / "b"), chunk_size=200, seed=1)
+    assert open(a["paths"]["orders"]).read() == open(b["paths"]["orders"]).read()
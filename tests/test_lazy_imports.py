@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+HEAVY = ["chromadb", "langchain_openai", "langchain_huggingface", "langchain_core", "sentence_transformers", "dotenv"]
+
+
+def _loaded_after_import(module):
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+
+def test_agent_import_is_lightweight():
+    assert _loaded_after_import("agent.text_to_sql_agent") == []
+
+
+def test_app_utils_import_is_lightweight():
+    assert _loaded_after_import("app.utils") == []
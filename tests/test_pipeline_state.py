@@ -0,0 +1,40 @@
+from sqlalchemy import create_engine
+
+from scripts import pipeline_state
+
+
+def test_hash_files_tracks_content(tmp_path):
+    f = tmp_path / "orders.csv"
+    f.write_text("order_id\nO001\n")
+    first = pipeline_state.hash_files([str(f)])
+    assert pipeline_state.hash_files([str(f)]) == first
+    f.write_text("order_id\nO001\nO002\n")
+    assert pipeline_state.hash_files([str(f)]) != first
+
+
+def test_state_skip_roundtrip(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'state.db'}")
+    # Fresh database (no state table yet): nothing is skipped
+    assert pipeline_state.get_state(engine, "raw_orders") is None
+    assert not pipeline_state.is_unchanged(engine, "raw_orders", "abc")
+    pipeline_state.mark_done(engine, "raw_orders", "abc")
+    assert pipeline_state.is_unchanged(engine, "raw_orders", "abc")
+    assert not pipeline_state.is_unchanged(engine, "raw_orders", "def")
+    pipeline_state.mark_done(engine, "raw_orders", "def")
+    assert pipeline_state.get_state(engine, "raw_orders") == "def"
+
+
+def test_state_rolls_back_with_the_load(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'state.db'}")
+    pipeline_state.ensure_table(engine)
+    try:
+        with engine.begin() as conn:
+            pipeline_state.mark_done(conn, "raw_orders", "abc")
+            raise RuntimeError("load failed")
+    except RuntimeError:
+        pass
+    assert pipeline_state.get_state(engine, "raw_orders") is None
+
+
+def test_hash_json_ignores_key_order():
+    assert pipeline_state.hash_json({"a": 1, "b": 2}) == pipeline_state.hash_json({"b": 2, "a": 1})
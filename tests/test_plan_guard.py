@@ -0,0 +1,95 @@
+from agent import plan_guard
+
+
+def no_stats(tables):
+    return ()
+
+
+def fake_explain(cost_without_limit, cost_with_limit):
+    def explain(sql):
+        cost = cost_with_limit if "LIMIT" in sql.upper() else cost_without_limit
+        return {"Total Cost": cost, "Plan Rows": 10}
+    return explain
+
+
+def test_plan_cache_uses_normalized_sql():
+    plan_guard.clear_plan_cache()
+    calls = []
+
+    def explain(sql):
+        calls.append(sql)
+        return {"Total Cost": 1.0, "Plan Rows": 1}
+
+    plan_guard.get_plan("select *  from fct_orders;", explain, no_stats)
+    plan_guard.get_plan("SELECT * FROM fct_orders", explain, no_stats)
+    assert len(calls) == 1
+
+
+def test_check_plan_accepts_cheap_query():
+    plan_guard.clear_plan_cache()
+    res = plan_guard.check_plan("SELECT * FROM fct_orders LIMIT 5", max_cost=100, max_rows=100,
+                                stats=no_stats, explain=fake_explain(10, 10))
+    assert res["ok"] and not res["rewritten"]
+
+
+def test_check_plan_adds_limit_when_that_fits_budget():
+    plan_guard.clear_plan_cache()
+    res = plan_guard.check_plan("SELECT * FROM raw_orders", max_cost=100, max_rows=100,
+                                stats=no_stats, explain=fake_explain(5000, 50))
+    assert res["ok"] and res["rewritten"]
+    assert "LIMIT" in res["sql"]
+
+
+def test_check_plan_rejects_expensive_query():
+    plan_guard.clear_plan_cache()
+    res = plan_guard.check_plan("SELECT * FROM raw_orders a, raw_orders b", max_cost=100, max_rows=100,
+                                stats=no_stats, explain=fake_explain(5000, 4000))
+    assert not res["ok"]
+    assert "cross joins" in res["reason"]
+
+
+def test_check_plan_does_not_limit_aggregates():
+    plan_guard.clear_plan_cache()
+    res = plan_guard.check_plan("SELECT product_id, SUM(total_revenue) FROM fct_orders GROUP BY product_id",
+                                max_cost=100, max_rows=100, stats=no_stats, explain=fake_explain(5000, 50))
+    assert not res["ok"] and not res["rewritten"]
+
+
+def test_plan_cache_revalidates_stats_only_after_ttl():
+    plan_guard.clear_plan_cache()
+    calls = []
+    stats_calls = []
+    live_rows = {"n": 100}
+
+    def explain(sql):
+        calls.append(sql)
+        return {"Total Cost": 1.0, "Plan Rows": 1}
+
+    def stats(tables):
+        assert tables == ["fct_orders"]
+        stats_calls.append(tables)
+        return (("fct_orders", live_rows["n"]),)
+
+    sql = "WITH x AS (SELECT * FROM fct_orders) SELECT * FROM x"
+    plan_guard.get_plan(sql, explain, stats)
+    # Hit within the TTL: no EXPLAIN and no stats round trip
+    plan_guard.get_plan(sql, explain, stats)
+    assert len(calls) == 1 and len(stats_calls) == 1
+
+    # TTL expired but stats unchanged: entry renewed without EXPLAIN
+    plan_guard.get_plan(sql, explain, stats, ttl=0)
+    assert len(calls) == 1 and len(stats_calls) == 2
+
+    # TTL expired and table reloaded with more rows: cached plan is stale
+    live_rows["n"] = 1_000_000
+    plan_guard.get_plan(sql, explain, stats, ttl=0)
+    assert len(calls) == 2
+
+
+def test_settings_are_read_at_call_time(monkeypatch, tmp_path):
+    # Values set after import (e.g. by the agent's lazy .env load) must apply
+    monkeypatch.setenv("PLAN_DEFAULT_LIMIT", "7")
+    monkeypatch.setenv("PLAN_STATS_PATH", str(tmp_path / "plan_stats.jsonl"))
+    assert plan_guard.add_limit("SELECT * FROM raw_orders").endswith("LIMIT 7")
+    plan_guard.record_plan_stats({"sql": "SELECT 1", "ok": True, "rewritten": False, "plan_cost": 1, "plan_rows": 1})
+    assert (tmp_path / "plan_stats.jsonl").exists()
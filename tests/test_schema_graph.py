@@ -0,0 +1,44 @@
+from agent import schema_graph
+
+SEMANTIC = {
+    "entities": {
+        "orders": {"model": "fct_orders", "description": "Order facts"},
+        "inventory": {"model": "dim_inventory", "description": "Inventory"},
+        "shipments": {"model": "stg_shipments", "description": "Shipments"},
+    },
+    "metrics": {"total_revenue": {"sql": "SUM(total_revenue)", "model": "fct_orders"}},
+    "dimensions": {"reorder_needed": {"sql": "reorder_needed", "model": "dim_inventory"}},
+    "joins": [
+        {
+            "left_model": "fct_orders",
+            "right_model": "dim_inventory",
+            "condition": "fct_orders.product_id = dim_inventory.product_id",
+        }
+    ],
+}
+
+
+def test_adaptive_k_cuts_at_largest_gap():
+    assert schema_graph.adaptive_k([0.10, 0.12, 0.60, 0.62, 0.65], max_k=5) == 2
+    # Evenly spread scores: no clear cut, keep everything
+    assert schema_graph.adaptive_k([0.1, 0.2, 0.3, 0.4], max_k=5) == 4
+
+
+def test_connect_models_follows_joins():
+    graph = schema_graph.build_graph(SEMANTIC)
+    assert schema_graph.connect_models(graph, ["fct_orders", "dim_inventory"]) == ["fct_orders", "dim_inventory"]
+    # No join path: seed is still included on its own
+    assert set(schema_graph.connect_models(graph, ["fct_orders", "stg_shipments"])) == {"fct_orders", "stg_shipments"}
+
+
+def test_build_context_prunes_and_adds_join():
+    docs = ["METRICS total_revenue: ...", "DIMENSIONS reorder_needed: ...", "ENTITIES shipments: ..."]
+    metas = [
+        {"type": "metrics", "name": "total_revenue"},
+        {"type": "dimensions", "name": "reorder_needed"},
+        {"type": "entities", "name": "shipments"},
+    ]
+    context = schema_graph.build_context(SEMANTIC, docs, metas, max_k=3, distances=[0.1, 0.15, 0.9])
+    assert "ENTITIES shipments" not in context
+    assert "ENTITIES orders" in context and "ENTITIES inventory" in context
+    assert "fct_orders.product_id = dim_inventory.product_id" in context